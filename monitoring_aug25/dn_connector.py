@@ -2,12 +2,18 @@
 
 # --- Core Imports ---
 import os
+import atexit
 import logging
-from typing import Union
+import threading
+import time
+from decimal import Decimal
+from typing import Iterator, Optional, Union
 
 # --- Library Imports ---
 import snowflake.connector
+from snowflake.connector.errors import NotSupportedError
 import pandas as pd
+import pyarrow as pa
 
 # --- DEPENDENCY MANAGEMENT ---
 # To avoid SSL/certificate errors with large datasets, ensure your Snowflake connector is up-to-date.
@@ -15,14 +21,15 @@ import pandas as pd
 # pip install --upgrade snowflake-connector-python
 
 # Automatic version check for the Snowflake connector
+# The version is read from the already-imported module rather than importlib.metadata,
+# which would scan site-packages metadata on every import
 try:
     from packaging import version
-    import importlib.metadata
     
     # Define the minimum recommended version to avoid common bugs
     RECOMMENDED_SNOWFLAKE_VERSION = "3.0.0"
     
-    installed_version_str = importlib.metadata.version("snowflake-connector-python")
+    installed_version_str = snowflake.connector.__version__
     installed_v = version.parse(installed_version_str)
     recommended_v = version.parse(RECOMMENDED_SNOWFLAKE_VERSION)
     
@@ -37,8 +44,6 @@ try:
 
 except ImportError:
     logging.warning("⚠️ Could not perform Snowflake connector version check. Consider installing 'packaging': pip install packaging")
-except importlib.metadata.PackageNotFoundError:
-    logging.error("❌ 'snowflake-connector-python' is not installed. Please install it first.")
 
 
 # --- Basic Logging Configuration ---
@@ -56,43 +61,175 @@ except ImportError:
 
 # --- Connection Functions ---
 
+# One connection is shared per process so the external-browser login runs only once
+_CONN = None
+_LOCK = threading.Lock()
+
+class _SharedConnection:
+    """
+    Proxy for the process-wide Snowflake connection. Every caller gets the same handle,
+    so close() is a no-op; the atexit hook closes the real connection via close_shared().
+    Attribute reads and writes go straight to the underlying connection.
+    """
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def close(self):
+        """Leave the shared connection open for other holders."""
+        logging.info("♻️ Keeping shared Snowflake connection open for reuse.")
+
+    def close_shared(self):
+        """Actually close the underlying connection."""
+        self._conn.close()
+
+# Connections used successfully within this many seconds are trusted without a SELECT 1 probe
+CONNECTION_PROBE_INTERVAL_SECONDS = 60
+
 def get_snowflake_connection():
     """
-    Establishes and returns a new connection to Snowflake.
+    Returns the shared connection to Snowflake, establishing a new one if needed.
     This function encapsulates the connection logic.
     """
-    logging.info("Establishing new Snowflake connection...")
-    try:
-        conn = snowflake.connector.connect(
-            user=os.getlogin().upper().replace(".", "_"),
-            account='missionlane.us-east-1',
-            authenticator='externalbrowser',
-            warehouse='ML_QRY_WH',
-            database='datamart_db',
-            schema='public'
-        )
-        logging.info("✅ Snowflake connection successful.")
-        return conn
-    except Exception as e:
-        logging.error(f"❌ Failed to connect to Snowflake: {e}")
-        raise # Re-raise the exception after logging
+    global _CONN
+    with _LOCK:
+        if _CONN is not None and is_connection_active(_CONN):
+            logging.info("♻️ Reusing active Snowflake connection.")
+            return _CONN
+        
+        if _CONN is not None:
+            # Release the stale connection before replacing it
+            try:
+                _CONN.close_shared()
+            except Exception:
+                pass
+        
+        logging.info("Establishing new Snowflake connection...")
+        try:
+            conn = snowflake.connector.connect(
+                user=os.getlogin().upper().replace(".", "_"),
+                account='missionlane.us-east-1',
+                authenticator='externalbrowser',
+                warehouse='ML_QRY_WH',
+                database='datamart_db',
+                schema='public',
+                client_session_keep_alive=True
+            )
+            _CONN = _SharedConnection(conn)
+            mark_connection_ok(_CONN)
+            logging.info("✅ Snowflake connection successful.")
+            return _CONN
+        except Exception as e:
+            logging.error(f"❌ Failed to connect to Snowflake: {e}")
+            raise # Re-raise the exception after logging
+
+def _close_shared_connection():
+    """Close the shared connection when the interpreter exits."""
+    if _CONN is not None and not _CONN.is_closed():
+        _CONN.close_shared()
+
+atexit.register(_close_shared_connection)
+
+def mark_connection_ok(conn):
+    """Record that the connection was just used successfully."""
+    conn._last_ok = time.monotonic()
 
 def is_connection_active(conn):
     """Check if the Snowflake connection is active."""
     if conn is None or conn.is_closed():
         return False
+    # Skip the round-trip if the connection was used successfully very recently
+    if time.monotonic() - getattr(conn, '_last_ok', float('-inf')) < CONNECTION_PROBE_INTERVAL_SECONDS:
+        return True
     try:
         # Test the connection with a simple query
         cursor = conn.cursor()
         cursor.execute("SELECT 1")
         cursor.fetchone()
         cursor.close()
+        mark_connection_ok(conn)
         return True
     except Exception:
         return False
 
 # --- Data Pulling Functions ---
 
+def fetch_arrow_table(cursor) -> Optional[pa.Table]:
+    """
+    Collect the executed query's result chunks into a single Arrow table.
+    Chunks are streamed one at a time, so peak memory stays near one table plus one chunk.
+    Returns None for empty result sets.
+    """
+    batches = []
+    for batch in cursor.fetch_arrow_batches():
+        batches.append(batch)
+    if not batches:
+        return None
+    table = pa.concat_tables(batches)
+    batches.clear()
+    return table
+
+def rows_to_pandas(cursor) -> pd.DataFrame:
+    """
+    Build a pandas DataFrame from row results, for when the result is not delivered as Arrow.
+    Columns of Python Decimal objects are converted to float to match the Arrow path.
+    """
+    columns = [desc[0] for desc in cursor.description]
+    df = pd.DataFrame(cursor.fetchall(), columns=columns)
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            values = df[col].dropna()
+            if not values.empty and isinstance(values.iat[0], Decimal):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+def cast_decimals_to_float(table: pa.Table, float_type: pa.DataType = pa.float64()) -> pa.Table:
+    """
+    Cast every decimal column of an Arrow table to float_type (float64 by default) in a
+    single Arrow cast, so pandas conversion yields float columns instead of Python Decimal objects.
+    """
+    schema = pa.schema([
+        pa.field(field.name, float_type, field.nullable) if pa.types.is_decimal(field.type) else field
+        for field in table.schema
+    ])
+    return table.cast(schema)
+
+def polars_schema_from_description(description) -> dict:
+    """
+    Build an explicit Polars schema from cursor.description so row data can be
+    loaded without a type-inference scan. Keyed by Snowflake's type_code.
+    """
+    sf_to_pl = {
+        1: pl.Float64,                  # REAL
+        2: pl.Utf8,                     # TEXT
+        3: pl.Date,                     # DATE
+        4: pl.Datetime("us"),           # TIMESTAMP
+        5: pl.Utf8,                     # VARIANT (JSON text)
+        6: pl.Datetime("us", "UTC"),    # TIMESTAMP_LTZ
+        7: pl.Datetime("us", "UTC"),    # TIMESTAMP_TZ
+        8: pl.Datetime("us"),           # TIMESTAMP_NTZ
+        9: pl.Utf8,                     # OBJECT (JSON text)
+        10: pl.Utf8,                    # ARRAY (JSON text)
+        11: pl.Binary,                  # BINARY
+        12: pl.Time,                    # TIME
+        13: pl.Boolean,                 # BOOLEAN
+    }
+    schema = {}
+    for col in description:
+        # Description entries are (name, type_code, display_size, internal_size, precision, scale, is_nullable)
+        name, type_code, scale = col[0], col[1], col[5]
+        if type_code == 0:
+            # NUMBER: integers when there is no scale, floats otherwise
+            schema[name] = pl.Int64 if scale == 0 else pl.Float64
+        else:
+            schema[name] = sf_to_pl.get(type_code, pl.Object)
+    return schema
+
 def pull_df_pl(cursor, query_syntax: str) -> pl.DataFrame:
     """Pull data using cursor and return as a Polars DataFrame."""
     if not POLARS_AVAILABLE:
@@ -100,19 +237,48 @@ def pull_df_pl(cursor, query_syntax: str) -> pl.DataFrame:
     
     try:
         cursor.execute(query_syntax)
-        columns = [col[0] for col in cursor.description]
-        results = cursor.fetchall()
-        df = pl.DataFrame(results, schema=columns, orient="row", infer_schema_length=100000)
+        # Fetch as Arrow to skip building Python row tuples before conversion
+        try:
+            table = fetch_arrow_table(cursor)
+        except NotSupportedError:
+            # Result was not delivered as Arrow; load rows with the schema Snowflake reported
+            logging.warning("⚠️ Arrow result format unavailable - building Polars DataFrame from rows")
+            schema = polars_schema_from_description(cursor.description)
+            df = pl.DataFrame(cursor.fetchall(), schema=schema, orient="row", infer_schema_length=0)
+            mark_connection_ok(cursor.connection)
+            return df
+        if table is None:
+            # Empty result sets have no chunks; keep the column names
+            columns = [col[0] for col in cursor.description]
+            df = pl.DataFrame(schema=columns)
+        else:
+            df = pl.from_arrow(table)
+        mark_connection_ok(cursor.connection)
         return df
     except Exception as e:
         logging.error(f"Error executing Polars query: {e}")
         raise
 
+def pull_df_pl_iter(cursor, query_syntax: str) -> Iterator[pl.DataFrame]:
+    """Pull data using cursor and yield one Polars DataFrame per result chunk."""
+    if not POLARS_AVAILABLE:
+        raise ImportError("Polars not available. Please install with: pip install polars")
+    
+    try:
+        cursor.execute(query_syntax)
+        for batch in cursor.fetch_arrow_batches():
+            yield pl.from_arrow(batch)
+        mark_connection_ok(cursor.connection)
+    except Exception as e:
+        logging.error(f"Error executing Polars query: {e}")
+        raise
+
 def pull_df_pd(cursor, query_syntax: str) -> pd.DataFrame:
     """Pull data using cursor and return as a Pandas DataFrame."""
     try:
         cursor.execute(query_syntax)
         df = cursor.fetch_pandas_all()
+        mark_connection_ok(cursor.connection)
         return df
     except Exception as e:
         logging.error(f"Error executing Pandas query: {e}")
@@ -5,14 +5,16 @@ Connects to Snowflake, executes SQL query, and generates data quality charts
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
+import numpy as np
+import pyarrow as pa
 import os
 import sys
-from dn_connector import get_snowflake_connection
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from snowflake.connector.errors import NotSupportedError
+from dn_connector import get_snowflake_connection, fetch_arrow_table, cast_decimals_to_float, mark_connection_ok, rows_to_pandas
 
-# Set matplotlib to non-interactive backend
-matplotlib.use('Agg')
+# Matplotlib and Pillow are imported lazily inside the render workers,
+# so the main process never pays their import cost
 
 def read_sql_file(file_path):
     """Read SQL query from file"""
@@ -37,20 +39,40 @@ def connect_to_database():
         print(f"❌ Database connection failed: {e}")
         sys.exit(1)
 
-def execute_query(connection, sql_query):
-    """Execute SQL query and return DataFrame"""
+def submit_query(connection, sql_query):
+    """Submit SQL query asynchronously and return the cursor tracking it"""
     try:
-        print("Executing SQL query...")
+        print("Submitting SQL query...")
         cursor = connection.cursor()
-        cursor.execute(sql_query)
-        
-        # Fetch results and column names
-        results = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
+        cursor.execute_async(sql_query)
+        print(f"✅ Query submitted (query id: {cursor.sfqid})")
+        return cursor
         
-        # Create DataFrame
-        df = pd.DataFrame(results, columns=columns)
+    except Exception as e:
+        print(f"❌ Query submission failed: {e}")
+        connection.close()
+        sys.exit(1)
+
+def collect_query_results(connection, cursor):
+    """Wait for a submitted query to finish and return its results as a DataFrame"""
+    try:
+        print("Waiting for SQL query results...")
+        cursor.get_results_from_sfqid(cursor.sfqid)
+        
+        # Stream result chunks as Arrow and convert to pandas once;
+        # decimals are cast to float in Arrow so no Decimal objects are created
+        try:
+            table = fetch_arrow_table(cursor)
+            if table is None:
+                df = pd.DataFrame(columns=[desc[0] for desc in cursor.description])
+            else:
+                df = cast_decimals_to_float(table).to_pandas()
+                del table
+        except NotSupportedError:
+            # Result was not delivered as Arrow; fall back to building rows in Python
+            df = rows_to_pandas(cursor)
         cursor.close()
+        mark_connection_ok(connection)
         
         print(f"✅ Query executed successfully! Retrieved {len(df)} rows and {len(df.columns)} columns.")
         return df
@@ -60,6 +82,10 @@ def execute_query(connection, sql_query):
         connection.close()
         sys.exit(1)
 
+def execute_query(connection, sql_query):
+    """Execute SQL query and return DataFrame"""
+    return collect_query_results(connection, submit_query(connection, sql_query))
+
 def create_output_directory(dir_path):
     """Create output directory for charts"""
     try:
@@ -69,267 +95,262 @@ def create_output_directory(dir_path):
         print(f"❌ Failed to create directory '{dir_path}': {e}")
         sys.exit(1)
 
-def is_numeric_column(series):
-    """Check if a pandas series contains numeric data"""
-    return pd.api.types.is_numeric_dtype(series)
-
-def is_categorical_column(series, max_unique=50):
+def is_categorical_column(series, max_unique=50, nunique=None):
     """Check if a pandas series should be treated as categorical"""
-    return series.nunique() <= max_unique and series.nunique() > 1
+    if nunique is None:
+        nunique = series.nunique()
+    return 1 < nunique <= max_unique
 
 def create_range_groups(series, num_groups=8):
-    """Create range-based groups for high-cardinality numeric columns"""
+    """Count values of a high-cardinality numeric column in equal-width ranges.
+    Returns (counts, range_labels); both are empty when there is no data."""
     try:
-        clean_data = series.dropna()
-        if len(clean_data) == 0:
-            return pd.Series(dtype='category')
-        
-        min_val = clean_data.min()
-        max_val = clean_data.max()
+        clean_data = series.dropna().to_numpy(dtype=float)
+        if clean_data.size == 0:
+            return np.array([], dtype=int), []
         
-        # Create range boundaries
-        range_size = (max_val - min_val) / num_groups
-        
-        # Create labels for ranges
-        range_labels = []
-        for i in range(num_groups):
-            start = min_val + i * range_size
-            end = min_val + (i + 1) * range_size
-            if i == num_groups - 1:  # Last group includes max value
-                range_labels.append(f"{start:.0f}-{end:.0f}")
-            else:
-                range_labels.append(f"{start:.0f}-{end:.0f}")
+        # Single pass binning; the last range includes the max value
+        counts, edges = np.histogram(clean_data, bins=num_groups)
+        range_labels = [f"{edges[i]:.0f}-{edges[i + 1]:.0f}" for i in range(num_groups)]
         
-        # Create bins and assign to groups
-        bins = [min_val + i * range_size for i in range(num_groups + 1)]
-        bins[-1] = max_val + 0.001  # Ensure max value is included
-        
-        # Create categorical groups
-        groups = pd.cut(series, bins=bins, labels=range_labels, include_lowest=True)
-        
-        return groups
+        return counts, range_labels
         
     except Exception as e:
         print(f"  ⚠️  Error creating range groups: {e}")
-        return pd.Series(dtype='category')
+        return np.array([], dtype=int), []
+
+# Threads that PNG-encode and write finished charts while this process draws the next one
+_WRITER_POOL = None
+_PENDING_WRITES = []
+
+def _encode_and_write_png(rgba, size, filepath, description):
+    """Encode a raw RGBA buffer as PNG and write it to disk (runs on a writer thread)"""
+    from PIL import Image
+    Image.frombuffer('RGBA', size, rgba, 'raw', 'RGBA', 0, 1).save(filepath, optimize=False, compress_level=1)
+    print(f"  📊 Created {description}")
+
+def save_chart(fig, filepath, description):
+    """Rasterize the figure and hand PNG encoding + disk write to the writer pool.
+    Call wait_for_chart_writes to block until the file is written."""
+    global _WRITER_POOL
+    if _WRITER_POOL is None:
+        _WRITER_POOL = ThreadPoolExecutor(max_workers=2)
+    fig.tight_layout()
+    rgba, size = fig.canvas.print_to_buffer()
+    _PENDING_WRITES.append(_WRITER_POOL.submit(_encode_and_write_png, rgba, size, filepath, description))
 
-def create_range_bar_chart(series, column_name, output_dir):
+def wait_for_chart_writes():
+    """Wait for every queued PNG write, re-raising the first failure"""
+    futures = _PENDING_WRITES[:]
+    _PENDING_WRITES.clear()
+    for future in futures:
+        future.result()
+
+def create_range_bar_chart(ax, series, column_name, output_dir):
     """Create and save bar chart for high-cardinality numeric column using ranges"""
     try:
-        plt.figure(figsize=(12, 6))
-        
-        # Create range groups
-        range_groups = create_range_groups(series, num_groups=8)
+        # Count values per range
+        counts, range_labels = create_range_groups(series, num_groups=8)
         
-        if len(range_groups.dropna()) == 0:
-            plt.text(0.5, 0.5, 'No data to plot', ha='center', va='center', transform=plt.gca().transAxes)
+        if counts.sum() == 0:
+            ax.text(0.5, 0.5, 'No data to plot', ha='center', va='center', transform=ax.transAxes)
         else:
-            # Get value counts for ranges
-            value_counts = range_groups.value_counts().sort_index()
-            
             # Create bar chart
-            bars = plt.bar(range(len(value_counts)), value_counts.values, color='lightgreen', alpha=0.7)
+            bars = ax.bar(range(len(counts)), counts, color='lightgreen', alpha=0.7)
             
             # Customize the plot
-            plt.title(f'{column_name} Distribution by Ranges\nTotal Records: {len(series.dropna())}')
-            plt.xlabel(f'{column_name} Ranges')
-            plt.ylabel('Count')
+            ax.set_title(f'{column_name} Distribution by Ranges\nTotal Records: {counts.sum()}')
+            ax.set_xlabel(f'{column_name} Ranges')
+            ax.set_ylabel('Count')
             
             # Set x-axis labels
-            plt.xticks(range(len(value_counts)), value_counts.index, rotation=45, ha='right')
+            ax.set_xticks(range(len(counts)), range_labels, rotation=45, ha='right')
             
             # Add value labels on bars
-            for bar, count in zip(bars, value_counts.values):
-                plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01*max(value_counts.values),
-                        str(count), ha='center', va='bottom')
+            ax.bar_label(bars, padding=3)
             
-            plt.grid(True, alpha=0.3, axis='y')
+            ax.grid(True, alpha=0.3, axis='y')
         
         # Save the plot
         filename = f"{column_name}_ranges_barchart.png"
         filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"  📊 Created range bar chart: {filename}")
+        save_chart(ax.figure, filepath, f"range bar chart: {filename}")
         
     except Exception as e:
         print(f"  ❌ Failed to create range bar chart for {column_name}: {e}")
-        plt.close()
 
-def create_histogram(series, column_name, output_dir):
+def create_histogram(ax, series, column_name, output_dir):
     """Create and save histogram for numeric column"""
     try:
-        plt.figure(figsize=(10, 6))
-        
         # Remove null values for plotting
         clean_data = series.dropna()
         
         if len(clean_data) == 0:
-            plt.text(0.5, 0.5, 'No data to plot', ha='center', va='center', transform=plt.gca().transAxes)
+            ax.text(0.5, 0.5, 'No data to plot', ha='center', va='center', transform=ax.transAxes)
         else:
-            plt.hist(clean_data, bins=30, alpha=0.7, color='skyblue', edgecolor='black')
+            ax.hist(clean_data, bins=30, alpha=0.7, color='skyblue', edgecolor='black')
             
             # Add statistics to title
             mean_val = clean_data.mean()
             min_val = clean_data.min()
             max_val = clean_data.max()
             
-            plt.title(f'{column_name} Distribution\nMean: {mean_val:.4f}, Min: {min_val:.4f}, Max: {max_val:.4f}')
-            plt.xlabel(column_name)
-            plt.ylabel('Frequency')
-            plt.grid(True, alpha=0.3)
+            ax.set_title(f'{column_name} Distribution\nMean: {mean_val:.4f}, Min: {min_val:.4f}, Max: {max_val:.4f}')
+            ax.set_xlabel(column_name)
+            ax.set_ylabel('Frequency')
+            ax.grid(True, alpha=0.3)
         
         # Save the plot
         filename = f"{column_name}_histogram.png"
         filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"  📊 Created histogram: {filename}")
+        save_chart(ax.figure, filepath, f"histogram: {filename}")
         
     except Exception as e:
         print(f"  ❌ Failed to create histogram for {column_name}: {e}")
-        plt.close()
 
-def create_bar_chart(series, column_name, output_dir):
+def create_bar_chart(ax, series, column_name, output_dir):
     """Create and save bar chart for categorical column"""
     try:
-        plt.figure(figsize=(12, 6))
-        
         # Get value counts
         value_counts = series.value_counts()
         
         if len(value_counts) == 0:
-            plt.text(0.5, 0.5, 'No data to plot', ha='center', va='center', transform=plt.gca().transAxes)
+            ax.text(0.5, 0.5, 'No data to plot', ha='center', va='center', transform=ax.transAxes)
         else:
             # Create bar chart
-            bars = plt.bar(range(len(value_counts)), value_counts.values, color='lightcoral', alpha=0.7)
+            bars = ax.bar(range(len(value_counts)), value_counts.values, color='lightcoral', alpha=0.7)
             
             # Customize the plot
-            plt.title(f'{column_name} Value Counts\nUnique Values: {len(value_counts)}')
-            plt.xlabel(column_name)
-            plt.ylabel('Count')
+            ax.set_title(f'{column_name} Value Counts\nUnique Values: {len(value_counts)}')
+            ax.set_xlabel(column_name)
+            ax.set_ylabel('Count')
             
             # Set x-axis labels
-            plt.xticks(range(len(value_counts)), value_counts.index, rotation=45, ha='right')
+            ax.set_xticks(range(len(value_counts)), value_counts.index, rotation=45, ha='right')
             
             # Add value labels on bars
-            for bar, count in zip(bars, value_counts.values):
-                plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01*max(value_counts.values),
-                        str(count), ha='center', va='bottom')
+            ax.bar_label(bars, padding=3)
             
-            plt.grid(True, alpha=0.3, axis='y')
+            ax.grid(True, alpha=0.3, axis='y')
         
         # Save the plot
         filename = f"{column_name}_barchart.png"
         filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"  📊 Created bar chart: {filename}")
+        save_chart(ax.figure, filepath, f"bar chart: {filename}")
         
     except Exception as e:
         print(f"  ❌ Failed to create bar chart for {column_name}: {e}")
-        plt.close()
 
-def convert_decimals_to_float(df):
-    """Convert Decimal columns to float to avoid calculation errors"""
-    print("🔄 Converting Decimal columns to float...")
-    
-    import decimal
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            # Check if column contains Decimal objects
-            sample_val = df[col].dropna().iloc[0] if not df[col].dropna().empty else None
-            if isinstance(sample_val, decimal.Decimal):
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                print(f"  • Converted {col} from Decimal to float")
-    
-    return df
+# Chart kind -> (renderer, figure size), as classified in generate_charts
+CHART_RENDERERS = {
+    'histogram': (create_histogram, (10, 6)),
+    'bar': (create_bar_chart, (12, 6)),
+    'range': (create_range_bar_chart, (12, 6)),
+}
+
+# Figure reused for every chart rendered by this process
+_FIGURE = None
+
+def _get_axes(figsize):
+    """Clear the process-wide Figure, resize it and return a fresh Axes"""
+    global _FIGURE
+    if _FIGURE is None:
+        import matplotlib
+        # Set matplotlib to non-interactive backend
+        matplotlib.use('Agg')
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        
+        _FIGURE = Figure(dpi=150)
+        FigureCanvasAgg(_FIGURE)
+    _FIGURE.clear()
+    _FIGURE.set_size_inches(figsize)
+    return _FIGURE.add_subplot(111)
+
+def _series_to_ipc(series):
+    """Serialize a series as Arrow IPC bytes for handing to a worker process"""
+    table = pa.Table.from_pandas(series.to_frame(), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _series_from_ipc(series_bytes):
+    """Rebuild a series from Arrow IPC bytes produced by _series_to_ipc"""
+    table = pa.ipc.open_stream(series_bytes).read_all()
+    return table.to_pandas().iloc[:, 0]
+
+def _warm_worker():
+    """Start a render worker and build its Figure before any charts are queued"""
+    _get_axes(CHART_RENDERERS['histogram'][1])
+
+def start_render_workers(executor, num_workers):
+    """Start every worker in the render pool so process start-up overlaps other work.
+    Returns futures that complete once each worker has built its Figure."""
+    return [executor.submit(_warm_worker) for _ in range(num_workers)]
+
+def _render_column(column_name, series_bytes, kind, output_dir):
+    """Render the chart for a single column (runs in a worker process)"""
+    series = _series_from_ipc(series_bytes)
+    renderer, figsize = CHART_RENDERERS[kind]
+    renderer(_get_axes(figsize), series, column_name, output_dir)
+    # Block until the PNG is on disk so write errors surface in the parent
+    wait_for_chart_writes()
 
 def calculate_tableau_metrics(df):
     """Calculate final metrics according to Tableau logic"""
     print("\n🧮 Calculating Tableau metrics...")
     
-    # Create a copy to avoid modifying original DataFrame
-    df_with_metrics = df.copy()
-    
-    # Convert Decimal columns to float first
-    df_with_metrics = convert_decimals_to_float(df_with_metrics)
-    
     try:
-        # Helper function to safely replace zeros with NaN
+        # Helper function to divide two columns in one pass, writing NaN where the denominator is zero
         def safe_divide(numerator, denominator):
-            denom_safe = denominator.replace(0, float('nan'))
-            return numerator / denom_safe
+            num = df[numerator].to_numpy(dtype=np.float64)
+            den = df[denominator].to_numpy(dtype=np.float64)
+            out = np.full(num.shape, np.nan)
+            np.divide(num, den, out=out, where=(den != 0))
+            return out
+        
+        new_cols = {}
         
         # Pbad per open: charged_off_statements/open_statements
-        df_with_metrics['TABLEAU_PBAD_PER_OPEN'] = safe_divide(
-            df_with_metrics['CHARGED_OFF_STATEMENTS'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
+        new_cols['TABLEAU_PBAD_PER_OPEN'] = safe_divide('CHARGED_OFF_STATEMENTS', 'OPEN_STATEMENTS')
         
         # Severity: principal_balance_chargedoff_accounts/credit_limit_chargedoff_accounts
-        df_with_metrics['TABLEAU_SEVERITY'] = safe_divide(
-            df_with_metrics['PRINCIPAL_BALANCE_CHARGEDOFF_ACCOUNTS'], 
-            df_with_metrics['CREDIT_LIMIT_CHARGEDOFF_ACCOUNTS']
-        )
+        new_cols['TABLEAU_SEVERITY'] = safe_divide('PRINCIPAL_BALANCE_CHARGEDOFF_ACCOUNTS', 'CREDIT_LIMIT_CHARGEDOFF_ACCOUNTS')
         
         # Util: principal_balance_open_accounts/credit_limit_open_accounts (note: fixing typo in logic file)
-        if 'PRINCIPAL_BALANCE_OPEN_ACCOUNTS' in df_with_metrics.columns:
-            df_with_metrics['TABLEAU_UTIL'] = safe_divide(
-                df_with_metrics['PRINCIPAL_BALANCE_OPEN_ACCOUNTS'], 
-                df_with_metrics['CREDIT_LIMIT_OPEN_ACCOUNTS']
-            )
-        elif 'TOTAL_BALANCE_OPEN_ACCOUNTS' in df_with_metrics.columns:
+        if 'PRINCIPAL_BALANCE_OPEN_ACCOUNTS' in df.columns:
+            new_cols['TABLEAU_UTIL'] = safe_divide('PRINCIPAL_BALANCE_OPEN_ACCOUNTS', 'CREDIT_LIMIT_OPEN_ACCOUNTS')
+        elif 'TOTAL_BALANCE_OPEN_ACCOUNTS' in df.columns:
             # Use total balance if principal balance not available
-            df_with_metrics['TABLEAU_UTIL'] = safe_divide(
-                df_with_metrics['TOTAL_BALANCE_OPEN_ACCOUNTS'], 
-                df_with_metrics['CREDIT_LIMIT_OPEN_ACCOUNTS']
-            )
+            new_cols['TABLEAU_UTIL'] = safe_divide('TOTAL_BALANCE_OPEN_ACCOUNTS', 'CREDIT_LIMIT_OPEN_ACCOUNTS')
         
         # DQ30: bkt2_accounts/open_statements
-        df_with_metrics['TABLEAU_DQ30'] = safe_divide(
-            df_with_metrics['BKT2_ACCOUNTS'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
+        new_cols['TABLEAU_DQ30'] = safe_divide('BKT2_ACCOUNTS', 'OPEN_STATEMENTS')
         
         # Credit Line: credit_limit_open_accounts/open_statements
-        df_with_metrics['TABLEAU_CREDIT_LINE'] = safe_divide(
-            df_with_metrics['CREDIT_LIMIT_OPEN_ACCOUNTS'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
+        new_cols['TABLEAU_CREDIT_LINE'] = safe_divide('CREDIT_LIMIT_OPEN_ACCOUNTS', 'OPEN_STATEMENTS')
         
         # Cash Advance: cash_advance_takers/open_statements
-        df_with_metrics['TABLEAU_CASH_ADVANCE'] = safe_divide(
-            df_with_metrics['CASH_ADVANCE_TAKERS'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
+        new_cols['TABLEAU_CASH_ADVANCE'] = safe_divide('CASH_ADVANCE_TAKERS', 'OPEN_STATEMENTS')
         
         # Penalty: late_fees/open_statements
-        df_with_metrics['TABLEAU_PENALTY'] = safe_divide(
-            df_with_metrics['LATE_FEES'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
+        new_cols['TABLEAU_PENALTY'] = safe_divide('LATE_FEES', 'OPEN_STATEMENTS')
         
         # Pvol: purchase_balance_open_accounts/total_balance_open_accounts
-        df_with_metrics['TABLEAU_PVOL'] = safe_divide(
-            df_with_metrics['PURCHASE_BALANCE_OPEN_ACCOUNTS'], 
-            df_with_metrics['TOTAL_BALANCE_OPEN_ACCOUNTS']
-        )
+        new_cols['TABLEAU_PVOL'] = safe_divide('PURCHASE_BALANCE_OPEN_ACCOUNTS', 'TOTAL_BALANCE_OPEN_ACCOUNTS')
         
         # Attrition: voluntary_closures/open_statements
-        df_with_metrics['TABLEAU_ATTRITION'] = safe_divide(
-            df_with_metrics['VOLUNTARY_CLOSURES'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
+        new_cols['TABLEAU_ATTRITION'] = safe_divide('VOLUNTARY_CLOSURES', 'OPEN_STATEMENTS')
         
         # Outstanding: average_outstanding_balance_open_accounts (no calculation needed)
-        df_with_metrics['TABLEAU_OUTSTANDING'] = df_with_metrics['AVERAGE_OUTSTANDING_BALANCE_OPEN_ACCOUNTS']
+        new_cols['TABLEAU_OUTSTANDING'] = df['AVERAGE_OUTSTANDING_BALANCE_OPEN_ACCOUNTS'].to_numpy(dtype=np.float64)
         
         # Note: Revolve Rate ignored as requested
         
+        # assign() shares every existing column with the input instead of copying the frame
+        df_with_metrics = df.assign(**new_cols)
+        
         print("✅ Tableau metrics calculated successfully!")
         
         # Print summary of new metrics
@@ -345,8 +366,22 @@ def calculate_tableau_metrics(df):
         print("Proceeding with original DataFrame...")
         return df
 
-def generate_charts(df, output_dir):
-    """Generate charts for all columns in DataFrame"""
+def _run_render_tasks(executor, tasks, output_dir):
+    """Submit queued chart tasks to the pool and wait for all of them"""
+    futures = {
+        executor.submit(_render_column, column_name, series_bytes, kind, output_dir): column_name
+        for column_name, series_bytes, kind in tasks
+    }
+    for future in as_completed(futures):
+        try:
+            future.result()
+        except Exception as e:
+            print(f"  ❌ Failed to write chart for {futures[future]}: {e}")
+
+def generate_charts(df, output_dir, executor=None, num_workers=None):
+    """Generate charts for all columns in DataFrame.
+    Charts are rendered on executor if given, otherwise on a new process pool.
+    num_workers is the size of that pool (defaults to the CPU count)."""
     print(f"\n📈 Generating charts for {len(df.columns)} columns...")
     
     histogram_count = 0
@@ -354,12 +389,20 @@ def generate_charts(df, output_dir):
     range_chart_count = 0
     skipped_count = 0
     
+    # Classify columns here (cheap) and queue the rendering work for the process pool
+    tasks = []
+    
+    # Classify all columns up front: one nunique pass and one dtype check over the whole frame
+    nunique_all = df.nunique(dropna=True)
+    is_numeric_all = df.dtypes.map(pd.api.types.is_numeric_dtype)
+    
     for column_name in df.columns:
         print(f"\nProcessing column: {column_name}")
         series = df[column_name]
+        nunique = nunique_all[column_name]
         
         # Skip columns with all null values
-        if series.isna().all():
+        if nunique == 0:
             print(f"  ⚠️  Skipping {column_name}: All values are null")
             skipped_count += 1
             continue
@@ -369,25 +412,46 @@ def generate_charts(df, output_dir):
             series = series.astype(int)
             print(f"  🔄 Converted boolean column {column_name} to integer")
         
-        # Check if numeric
-        if is_numeric_column(series):
+        # Check if numeric (booleans count as numeric)
+        if is_numeric_all[column_name]:
             # For high-cardinality numeric columns, use range-based charts
-            if series.nunique() > 50:
-                create_range_bar_chart(series, column_name, output_dir)
-                range_chart_count += 1
-            else:
-                create_histogram(series, column_name, output_dir)
-                histogram_count += 1
+            kind = 'range' if nunique > 50 else 'histogram'
         
         # Check if categorical (low cardinality)
-        elif is_categorical_column(series):
-            create_bar_chart(series, column_name, output_dir)
-            bar_chart_count += 1
+        elif is_categorical_column(series, nunique=nunique):
+            kind = 'bar'
         
         else:
             # For very high cardinality non-numeric columns, still skip
-            print(f"  ⚠️  Skipping {column_name}: Too many unique values ({series.nunique()}) for visualization")
+            print(f"  ⚠️  Skipping {column_name}: Too many unique values ({nunique}) for visualization")
             skipped_count += 1
+            continue
+        
+        # Mixed-type object columns can't be serialized to Arrow; skip them rather than abort the run
+        try:
+            payload = _series_to_ipc(series)
+        except Exception as e:
+            print(f"  ❌ Skipping {column_name}: Could not serialize column data: {e}")
+            skipped_count += 1
+            continue
+        
+        if kind == 'range':
+            range_chart_count += 1
+        elif kind == 'histogram':
+            histogram_count += 1
+        else:
+            bar_chart_count += 1
+        tasks.append((column_name, payload, kind))
+    
+    # Render charts in parallel; each column is an independent Matplotlib job
+    if tasks:
+        num_workers = num_workers or os.cpu_count() or 1
+        print(f"\n🖼️  Rendering {len(tasks)} charts across {num_workers} processes...")
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=num_workers) as own_executor:
+                _run_render_tasks(own_executor, tasks, output_dir)
+        else:
+            _run_render_tasks(executor, tasks, output_dir)
     
     print(f"\n📊 Chart generation complete!")
     print(f"  • Histograms created: {histogram_count}")
@@ -409,29 +473,40 @@ def main():
     print(f"📖 Reading SQL query from: {sql_file_path}")
     sql_query = read_sql_file(sql_file_path)
     
-    # Step 2: Connect to database
-    connection = connect_to_database()
-    
-    try:
-        # Step 3: Execute query and load data
-        df = execute_query(connection, sql_query)
-        
-        # Step 4: Calculate Tableau metrics
-        df_with_metrics = calculate_tableau_metrics(df)
-        
-        # Step 5: Create output directory
-        create_output_directory(output_directory)
-        
-        # Step 6: Generate charts for all columns (original + calculated metrics)
-        generate_charts(df_with_metrics, output_directory)
-        
-    finally:
-        # Step 6: Close database connection
-        print("\n🔐 Closing database connection...")
-        connection.close()
-        print("✅ Database connection closed.")
+    # Step 2: Start the chart render workers before connecting, so no worker is
+    # forked from a process running the connector's keep-alive thread and socket
+    num_workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        warm_futures = start_render_workers(executor, num_workers)
+        
+        # Step 3: Connect to database
+        connection = connect_to_database()
+        
+        try:
+            # Step 4: Submit the query; Snowflake runs it while the local setup below proceeds
+            cursor = submit_query(connection, sql_query)
+            
+            # Step 5: Create output directory and wait for the render workers to be ready
+            create_output_directory(output_directory)
+            for future in warm_futures:
+                future.result()
+            
+            # Step 6: Wait for the query and load data
+            df = collect_query_results(connection, cursor)
+            
+            # Step 7: Calculate Tableau metrics
+            df_with_metrics = calculate_tableau_metrics(df)
+            
+            # Step 8: Generate charts for all columns (original + calculated metrics)
+            generate_charts(df_with_metrics, output_directory, executor, num_workers)
+            
+        finally:
+            # Step 9: Close database connection
+            print("\n🔐 Closing database connection...")
+            connection.close()
+            print("✅ Database connection closed.")
     
-    # Step 7: Print completion message
+    # Step 10: Print completion message
     print("\n" + "=" * 50)
     print("🎉 DATA QUALITY CHARTS CREATED SUCCESSFULLY!")
     print(f"📁 Charts saved to: {os.path.abspath(output_directory)}")
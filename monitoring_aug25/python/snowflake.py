@@ -2,8 +2,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dn_connector import get_snowflake_connection, pull_df
+from dn_connector import get_snowflake_connection, pull_df, rows_to_pandas
 import pandas as pd
+from snowflake.connector.errors import NotSupportedError
 from typing import Optional
 
 class SnowflakeConnector:
@@ -37,13 +38,12 @@ class SnowflakeConnector:
             self.cursor.execute(query)
             
             if fetch_results:
-                # Fetch results and column names
-                results = self.cursor.fetchall()
-                columns = [desc[0] for desc in self.cursor.description]
-                
-                # Convert to DataFrame
-                df = pd.DataFrame(results, columns=columns)
-                return df
+                # Fetch results directly into a DataFrame via the connector's Arrow path;
+                # JSON-format results (e.g. SHOW/DESCRIBE) don't support it, so fall back to rows
+                try:
+                    return self.cursor.fetch_pandas_all()
+                except NotSupportedError:
+                    return rows_to_pandas(self.cursor)
             else:
                 return None
                 
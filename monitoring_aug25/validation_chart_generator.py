@@ -4,17 +4,32 @@ Validation Chart Generator
 Creates actual vs assumption validation charts for the 10 key metrics
 """
 
+import argparse
+import decimal
+import hashlib
+import itertools
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
 import sys
-from dn_connector import get_snowflake_connection
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from snowflake.connector.errors import NotSupportedError
+from dn_connector import get_snowflake_connection, cast_decimals_to_float
 
 # Set matplotlib to non-interactive backend
 matplotlib.use('Agg')
 
+# With --cache, query results are kept here by content hash; --refresh re-runs the query
+CACHE_DIR = "cache"
+# Decimal columns are stored at this precision; it is part of the cache key
+CACHE_FLOAT_TYPE = pa.float64()
+
 def read_sql_file(file_path):
     """Read SQL query from file"""
     try:
@@ -38,122 +53,246 @@ def connect_to_database():
         print(f"❌ Database connection failed: {e}")
         sys.exit(1)
 
-def execute_query(connection, sql_query):
-    """Execute SQL query and return DataFrame"""
+def _line_comment_start(line):
+    """Return the index where a -- comment starts on this line (outside string literals), or None"""
+    in_string = False
+    for i, char in enumerate(line):
+        if char == "'":
+            in_string = not in_string
+        elif not in_string and line.startswith('--', i):
+            return i
+    return None
+
+def strip_statement_end(sql_query):
+    """Strip trailing whitespace, comments and semicolons so the query can be used as a subquery"""
+    while True:
+        sql_query = sql_query.rstrip()
+        if sql_query.endswith(';'):
+            sql_query = sql_query[:-1]
+        elif sql_query.endswith('*/') and '/*' in sql_query:
+            sql_query = sql_query[:sql_query.rindex('/*')]
+        else:
+            last_line_start = sql_query.rfind('\n') + 1
+            comment_start = _line_comment_start(sql_query[last_line_start:])
+            if comment_start is None:
+                return sql_query
+            sql_query = sql_query[:last_line_start + comment_start]
+
+def _quote_identifier(name):
+    """Quote a column name exactly as Snowflake reported it"""
+    return '"' + name.replace('"', '""') + '"'
+
+def project_needed_columns(cursor, sql_query):
+    """Wrap the query so only NEEDED_COLUMNS are returned.
+    Columns are checked with cursor.describe first, since Util and the assumptions are optional."""
+    sql_query = strip_statement_end(sql_query)
+    try:
+        # Upper-cased name -> name as reported, which may be a quoted mixed-case identifier
+        available = {desc[0].upper(): desc[0] for desc in cursor.describe(sql_query)}
+    except Exception as e:
+        print(f"⚠️  Could not describe query, fetching all columns: {e}")
+        return sql_query
+    
+    columns = [col for col in NEEDED_COLUMNS if col in available]
+    if not columns:
+        return sql_query
+    
+    print(f"  • Fetching {len(columns)} of {len(available)} columns")
+    # Select each column by its exact quoted name, aliased to the upper-case name the metrics use
+    select_list = ', '.join(f"{_quote_identifier(available[col])} AS {col}" for col in columns)
+    # Newline before the closing paren so a comment inside the query cannot swallow it
+    return f"SELECT {select_list} FROM (\n{sql_query}\n) t"
+
+def _rows_to_frame(cursor):
+    """Build a DataFrame from row results when the result is not delivered as Arrow"""
+    results = cursor.fetchall()
+    columns = [desc[0] for desc in cursor.description]
+    df = pd.DataFrame(results, columns=columns)
+    # Row results carry Python Decimal objects; convert them here, once
+    return convert_decimals_to_float(df)
+
+def query_cache_path(sql_query, cache_dir=CACHE_DIR):
+    """Content-addressed cache file for a query, keyed on the SQL text, the projected columns
+    and the stored float type"""
+    key_text = f"{sql_query}\n{','.join(NEEDED_COLUMNS)}\n{CACHE_FLOAT_TYPE}"
+    key = hashlib.sha1(key_text.encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.parquet")
+
+def save_query_result(connection, sql_query, result_path):
+    """Execute SQL query and stream its result batches into a zstd Parquet file"""
+    tmp_path = f"{result_path}.tmp"
+    writer = None
     try:
         print("Executing SQL query...")
         cursor = connection.cursor()
-        cursor.execute(sql_query)
-        
-        # Fetch results and column names
-        results = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        
-        # Create DataFrame
-        df = pd.DataFrame(results, columns=columns)
+        cursor.execute(project_needed_columns(cursor, sql_query))
+        
+        # Write to a temporary file first so an interrupted run never leaves a partial result
+        os.makedirs(os.path.dirname(result_path), exist_ok=True)
+        rows = 0
+        try:
+            # Decimals are cast to float in Arrow so no Decimal objects are created
+            for table in cursor.fetch_arrow_batches():
+                table = cast_decimals_to_float(table, CACHE_FLOAT_TYPE)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                writer.write_table(table)
+                rows += table.num_rows
+        except NotSupportedError:
+            # Result was not delivered as Arrow; fall back to building rows in Python
+            table = pa.Table.from_pandas(_rows_to_frame(cursor), preserve_index=False)
+            writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+            writer.write_table(table)
+            rows = table.num_rows
+        
+        if writer is None:
+            # Empty result: keep the column names so the cache is still a valid table
+            columns = [desc[0] for desc in cursor.description]
+            pq.write_table(pa.table({col: pa.nulls(0) for col in columns}), tmp_path, compression='zstd')
+        else:
+            writer.close()
         cursor.close()
+        os.replace(tmp_path, result_path)
         
-        print(f"✅ Query executed successfully! Retrieved {len(df)} rows and {len(df.columns)} columns.")
-        return df
+        print(f"✅ Query executed successfully! Saved {rows} rows to {result_path}")
         
     except Exception as e:
         print(f"❌ Query execution failed: {e}")
+        # Release the half-written file so no partial result is left behind
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         connection.close()
         sys.exit(1)
 
+def load_query_result(result_path):
+    """Load the whole saved query result as a DataFrame"""
+    df = pd.read_parquet(result_path)
+    print(f"✅ Loaded {len(df)} rows and {len(df.columns)} columns from {result_path}")
+    return df
+
+def iter_metric_frames(result_path):
+    """Yield one DataFrame with calculated metrics per record batch of the saved query result.
+    A metrics error is reported once; the remaining batches are yielded without metrics.
+    An empty result yields one empty frame with the file's schema, so the charts still get drawn."""
+    parquet_file = pq.ParquetFile(result_path)
+    metrics_ok = True
+    batches = parquet_file.iter_batches()
+    first = next(batches, None)
+    if first is None:
+        batches = [parquet_file.schema_arrow.empty_table()]
+    else:
+        batches = itertools.chain([first], batches)
+    for batch in batches:
+        df = batch.to_pandas()
+        if metrics_ok:
+            try:
+                df = add_metric_columns(df)
+            except Exception as e:
+                print(f"❌ Error calculating metrics: {e}")
+                print("Proceeding without calculated metrics...")
+                metrics_ok = False
+        yield df
+
 def convert_decimals_to_float(df):
     """Convert Decimal columns to float to avoid calculation errors"""
     print("🔄 Converting Decimal columns to float...")
     
-    import decimal
     for col in df.columns:
         if df[col].dtype == 'object':
-            # Check if column contains Decimal objects
-            sample_val = df[col].dropna().iloc[0] if not df[col].dropna().empty else None
+            # Check if column contains Decimal objects by sniffing its first non-null value;
+            # looked up by position so duplicate index labels cannot pick the wrong row
+            values = df[col].to_numpy()
+            valid = pd.notna(values)
+            sample_val = values[valid.argmax()] if valid.any() else None
             if isinstance(sample_val, decimal.Decimal):
                 df[col] = pd.to_numeric(df[col], errors='coerce')
                 print(f"  • Converted {col} from Decimal to float")
     
     return df
 
+# pandas 2.x copies every input block in concat unless copy=False; pandas 3 shares them
+# under Copy-on-Write and deprecates the keyword
+CONCAT_NO_COPY = {} if int(pd.__version__.split('.')[0]) >= 3 else {'copy': False}
+
+# Metrics only feed 30-bin histograms, so float32 is plenty and halves memory traffic.
+# Source data stays float64 in the cache and the debug dumps; only the arrays
+# used for metrics and histograms are narrowed.
+METRIC_DTYPE = np.float32
+
+# (new column, numerator column, denominator column) for each ratio metric.
+# A tuple numerator lists fallbacks; the first column present in the data is used.
+METRIC_SPEC = (
+    ('ACTUAL_PBAD_PER_OPEN', 'CHARGED_OFF_STATEMENTS', 'OPEN_STATEMENTS'),                         # 1. Pbad per open
+    ('ACTUAL_SEVERITY', 'PRINCIPAL_BALANCE_CHARGEDOFF_ACCOUNTS', 'CREDIT_LIMIT_CHARGEDOFF_ACCOUNTS'), # 2. Severity
+    ('ACTUAL_UTIL', ('PRINCIPAL_BALANCE_OPEN_ACCOUNTS', 'TOTAL_BALANCE_OPEN_ACCOUNTS'),
+     'CREDIT_LIMIT_OPEN_ACCOUNTS'),                                                                # 3. Util
+    ('ACTUAL_DQ30', 'BKT2_ACCOUNTS', 'OPEN_STATEMENTS'),                                            # 4. DQ30
+    ('ACTUAL_CREDIT_LINE', 'CREDIT_LIMIT_OPEN_ACCOUNTS', 'OPEN_STATEMENTS'),                        # 5. Credit Line
+    ('ACTUAL_CASH_ADVANCE', 'CASH_ADVANCE_TAKERS', 'OPEN_STATEMENTS'),                              # 6. Cash Advance
+    ('ACTUAL_PENALTY', 'LATE_FEES', 'OPEN_STATEMENTS'),                                             # 7. Penalty
+    ('ACTUAL_PVOL', 'PURCHASE_BALANCE_OPEN_ACCOUNTS', 'TOTAL_BALANCE_OPEN_ACCOUNTS'),               # 8. Pvol
+    ('ACTUAL_ATTRITION', 'VOLUNTARY_CLOSURES', 'OPEN_STATEMENTS'),                                  # 9. Attrition
+)
+
+# (metric name, actual column, assumption column) for each two-panel validation chart
+VALIDATION_METRICS = (
+    ("PBAD_PER_OPEN", "ACTUAL_PBAD_PER_OPEN", "PBAD"),
+    ("SEVERITY", "ACTUAL_SEVERITY", "SEVERITY"),
+    ("UTIL", "ACTUAL_UTIL", "UTILIZATION"),
+    ("CREDIT_LINE", "ACTUAL_CREDIT_LINE", "CREDIT_LINE"),
+    ("CASH_ADVANCE", "ACTUAL_CASH_ADVANCE", "CASH_ADVANCE_AGGREGATE"),
+    ("PENALTY", "ACTUAL_PENALTY", "PENALTY_AGGREGATE"),
+    ("PVOL", "ACTUAL_PVOL", "PVOL_AGGREGATE"),
+    ("ATTRITION", "ACTUAL_ATTRITION", "ATTRITION_AGGREGATE"),
+    ("OUTSTANDING", "ACTUAL_OUTSTANDING", "OUTSTANDING_AGGREGATE")
+)
+
+def _spec_columns():
+    """Every source column calculate_metrics and the charts can read"""
+    columns = {'AVERAGE_OUTSTANDING_BALANCE_OPEN_ACCOUNTS'}
+    for _, numerator, denominator in METRIC_SPEC:
+        columns.update(numerator if isinstance(numerator, tuple) else (numerator,))
+        columns.add(denominator)
+    columns.update(assumption_col for _, _, assumption_col in VALIDATION_METRICS)
+    return tuple(sorted(columns))
+
+# Source columns fetched from the query; everything else is projected away in Snowflake
+NEEDED_COLUMNS = _spec_columns()
+
+def add_metric_columns(df):
+    """Return df with the 10 key metric columns added, as METRIC_DTYPE arrays"""
+    columns = set(df.columns)
+    
+    # Each ratio is one np.divide pass; zero denominators are left as NaN
+    results = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for new_col, numerator_col, denominator_col in METRIC_SPEC:
+            if isinstance(numerator_col, tuple):
+                numerator_col = next((col for col in numerator_col if col in columns), None)
+            if numerator_col is None:
+                continue
+            num = df[numerator_col].to_numpy(dtype=METRIC_DTYPE, copy=False)
+            den = df[denominator_col].to_numpy(dtype=METRIC_DTYPE, copy=False)
+            out = np.full(len(num), np.nan, dtype=METRIC_DTYPE)
+            np.divide(num, den, out=out, where=den != 0)
+            results[new_col] = out
+    
+    # 10. Outstanding: average_outstanding_balance_open_accounts
+    results['ACTUAL_OUTSTANDING'] = df['AVERAGE_OUTSTANDING_BALANCE_OPEN_ACCOUNTS'].astype(METRIC_DTYPE)
+    
+    # The new columns are built as one frame and joined with a single concat.
+    # Inputs are only read, so the source columns are shared rather than copied
+    # (see CONCAT_NO_COPY for pandas 2.x)
+    return pd.concat([df, pd.DataFrame(results, index=df.index)], axis=1, **CONCAT_NO_COPY)
+
 def calculate_metrics(df):
     """Calculate the 10 key metrics according to metrics logic"""
     print("\n🧮 Calculating key metrics...")
     
-    # Create a copy to avoid modifying original DataFrame
-    df_with_metrics = df.copy()
-    
-    # Convert Decimal columns to float first
-    df_with_metrics = convert_decimals_to_float(df_with_metrics)
-    
     try:
-        # Helper function to safely replace zeros with NaN
-        def safe_divide(numerator, denominator):
-            denom_safe = denominator.replace(0, float('nan'))
-            return numerator / denom_safe
-        
-        # 1. Pbad per open: charged_off_statements/open_statements
-        df_with_metrics['ACTUAL_PBAD_PER_OPEN'] = safe_divide(
-            df_with_metrics['CHARGED_OFF_STATEMENTS'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
-        
-        # 2. Severity: principal_balance_chargedoff_accounts/credit_limit_chargedoff_accounts
-        df_with_metrics['ACTUAL_SEVERITY'] = safe_divide(
-            df_with_metrics['PRINCIPAL_BALANCE_CHARGEDOFF_ACCOUNTS'], 
-            df_with_metrics['CREDIT_LIMIT_CHARGEDOFF_ACCOUNTS']
-        )
-        
-        # 3. Util: principal_balance_open_accounts/credit_limit_open_accounts
-        if 'PRINCIPAL_BALANCE_OPEN_ACCOUNTS' in df_with_metrics.columns:
-            df_with_metrics['ACTUAL_UTIL'] = safe_divide(
-                df_with_metrics['PRINCIPAL_BALANCE_OPEN_ACCOUNTS'], 
-                df_with_metrics['CREDIT_LIMIT_OPEN_ACCOUNTS']
-            )
-        elif 'TOTAL_BALANCE_OPEN_ACCOUNTS' in df_with_metrics.columns:
-            df_with_metrics['ACTUAL_UTIL'] = safe_divide(
-                df_with_metrics['TOTAL_BALANCE_OPEN_ACCOUNTS'], 
-                df_with_metrics['CREDIT_LIMIT_OPEN_ACCOUNTS']
-            )
-        
-        # 4. DQ30: bkt2_accounts/open_statements
-        df_with_metrics['ACTUAL_DQ30'] = safe_divide(
-            df_with_metrics['BKT2_ACCOUNTS'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
-        
-        # 5. Credit Line: credit_limit_open_accounts/open_statements
-        df_with_metrics['ACTUAL_CREDIT_LINE'] = safe_divide(
-            df_with_metrics['CREDIT_LIMIT_OPEN_ACCOUNTS'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
-        
-        # 6. Cash Advance: cash_advance_takers/open_statements
-        df_with_metrics['ACTUAL_CASH_ADVANCE'] = safe_divide(
-            df_with_metrics['CASH_ADVANCE_TAKERS'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
-        
-        # 7. Penalty: late_fees/open_statements
-        df_with_metrics['ACTUAL_PENALTY'] = safe_divide(
-            df_with_metrics['LATE_FEES'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
-        
-        # 8. Pvol: purchase_balance_open_accounts/total_balance_open_accounts
-        df_with_metrics['ACTUAL_PVOL'] = safe_divide(
-            df_with_metrics['PURCHASE_BALANCE_OPEN_ACCOUNTS'], 
-            df_with_metrics['TOTAL_BALANCE_OPEN_ACCOUNTS']
-        )
-        
-        # 9. Attrition: voluntary_closures/open_statements
-        df_with_metrics['ACTUAL_ATTRITION'] = safe_divide(
-            df_with_metrics['VOLUNTARY_CLOSURES'], 
-            df_with_metrics['OPEN_STATEMENTS']
-        )
-        
-        # 10. Outstanding: average_outstanding_balance_open_accounts
-        df_with_metrics['ACTUAL_OUTSTANDING'] = df_with_metrics['AVERAGE_OUTSTANDING_BALANCE_OPEN_ACCOUNTS']
+        df_with_metrics = add_metric_columns(df)
         
         print("✅ Key metrics calculated successfully!")
         
@@ -164,16 +303,140 @@ def calculate_metrics(df):
         print("Proceeding with original DataFrame...")
         return df
 
-def create_validation_chart(df, metric_name, actual_col, assumption_col, output_dir):
-    """Create validation chart comparing actual vs assumption for a metric"""
+# Columns whose panels share bin edges: each validation chart's actual and assumption, plus DQ30 alone
+CHART_GROUPS = tuple((actual_col, assumption_col) for _, actual_col, assumption_col in VALIDATION_METRICS) + (('ACTUAL_DQ30',),)
+CHART_COLUMNS = tuple(dict.fromkeys(col for group in CHART_GROUPS for col in group))
+CHART_BINS = 30
+
+def _finite_values(frame, col):
+    """Return the finite values of a column as a METRIC_DTYPE array (NaN and +/-inf dropped)"""
+    values = frame[col].to_numpy(dtype=METRIC_DTYPE, copy=False)
+    return values[np.isfinite(values)]
+
+def scan_chart_columns(frames, spill_path):
+    """First pass: count, sum, min and max of every chart column present, from one agg call per batch.
+    The narrowed chart columns are spilled to spill_path so the second pass never recomputes metrics."""
+    stats = {}
+    present = None
+    writer = None
     try:
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+        for frame in frames:
+            if present is None:
+                present = [col for col in CHART_COLUMNS if col in frame.columns]
+                stats = {col: {'count': 0, 'sum': 0.0, 'min': np.inf, 'max': -np.inf} for col in present}
+            # Narrowed first so the ranges match the values that get binned
+            chart = frame.reindex(columns=present).astype(METRIC_DTYPE)
+            
+            # inf is masked to NaN so the stats cover the same finite values that get binned;
+            # NaNs are skipped by the aggregation; float32 sums are accumulated in float64
+            batch_stats = chart.where(np.isfinite(chart)).agg(['count', 'sum', 'min', 'max'])
+            for col in present:
+                count, total, low, high = batch_stats[col]
+                if count:
+                    col_stats = stats[col]
+                    col_stats['count'] += int(count)
+                    col_stats['sum'] += total
+                    col_stats['min'] = min(col_stats['min'], low)
+                    col_stats['max'] = max(col_stats['max'], high)
+            
+            table = pa.Table.from_pandas(chart, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(spill_path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return stats
+
+def histogram_range(stats, *columns):
+    """Return the (min, max) shared by the non-empty columns so panels can use common bin edges"""
+    non_empty = [stats[col] for col in columns if stats.get(col, {}).get('count')]
+    if not non_empty:
+        return None
+    return (min(col_stats['min'] for col_stats in non_empty), max(col_stats['max'] for col_stats in non_empty))
+
+def accumulate_histograms(spill_path, ranges):
+    """Second pass over the spilled chart columns: add up per-batch np.histogram counts;
+    fixed ranges make the counts additive"""
+    counts = {col: np.zeros(CHART_BINS, dtype=np.int64) for col in ranges}
+    edges = {}
+    if not ranges:
+        return counts, edges
+    for batch in pq.ParquetFile(spill_path).iter_batches(columns=list(ranges)):
+        frame = batch.to_pandas()
+        for col, value_range in ranges.items():
+            batch_counts, edges[col] = np.histogram(_finite_values(frame, col), bins=CHART_BINS, range=value_range)
+            counts[col] += batch_counts
+    return counts, edges
+
+def summarize_chart_columns(frames):
+    """Bin every chart column of the metric frames, consuming the iterable once.
+    Returns {column: {'count', 'mean', 'counts', 'edges'}}; counts and edges are None for empty columns."""
+    with tempfile.TemporaryDirectory() as spill_dir:
+        spill_path = os.path.join(spill_dir, 'chart_columns.parquet')
+        stats = scan_chart_columns(frames, spill_path)
+        
+        ranges = {}
+        for group in CHART_GROUPS:
+            value_range = histogram_range(stats, *group)
+            for col in group:
+                if stats.get(col, {}).get('count'):
+                    ranges[col] = value_range
+        counts, edges = accumulate_histograms(spill_path, ranges)
+    
+    summaries = {}
+    for col, col_stats in stats.items():
+        count = col_stats['count']
+        summaries[col] = {
+            'count': count,
+            'mean': col_stats['sum'] / count if count else np.nan,
+            'counts': counts.get(col),
+            'edges': edges.get(col),
+        }
+    return summaries
+
+def plot_histogram(ax, summary, color):
+    """Draw a column's pre-binned counts as one filled step outline instead of a patch per bar"""
+    x = np.repeat(summary['edges'], 2)[1:-1]
+    y = np.repeat(summary['counts'], 2)
+    ax.fill_between(x, 0, y, alpha=0.7, color=color, edgecolor='black')
+
+# One figure of each shape per process, cleared and redrawn for every chart
+_VALIDATION_FIGURE = None
+_DQ30_FIGURE = None
+
+def _get_validation_axes():
+    """Return the process-wide two-panel figure with both axes cleared"""
+    global _VALIDATION_FIGURE
+    if _VALIDATION_FIGURE is None:
+        _VALIDATION_FIGURE = plt.subplots(1, 2, figsize=(16, 6))
+        # Fixed margins for the fixed layout, set once instead of solving tight_layout per chart
+        _VALIDATION_FIGURE[0].subplots_adjust(left=0.06, right=0.98, top=0.9, bottom=0.12, wspace=0.15)
+    fig, (ax1, ax2) = _VALIDATION_FIGURE
+    ax1.clear()
+    ax2.clear()
+    return fig, ax1, ax2
+
+def _get_dq30_axes():
+    """Return the process-wide single-panel DQ30 figure with its axes cleared"""
+    global _DQ30_FIGURE
+    if _DQ30_FIGURE is None:
+        _DQ30_FIGURE = plt.subplots(figsize=(8, 6))
+        _DQ30_FIGURE[0].subplots_adjust(left=0.1, right=0.96, top=0.9, bottom=0.1)
+    fig, ax = _DQ30_FIGURE
+    ax.clear()
+    return fig, ax
+
+def create_validation_chart(metric_name, actual, assumption, output_dir):
+    """Create validation chart comparing actual vs assumption for a metric.
+    Both are column summaries from summarize_chart_columns; assumption is None when the column is missing."""
+    try:
+        fig, ax1, ax2 = _get_validation_axes()
         
         # Chart 1: Actual values
-        actual_data = df[actual_col].dropna()
-        if len(actual_data) > 0:
-            ax1.hist(actual_data, bins=30, alpha=0.7, color='skyblue', edgecolor='black')
-            ax1.set_title(f'{metric_name} - Actual\nMean: {actual_data.mean():.4f}, Count: {len(actual_data)}')
+        if actual['count'] > 0:
+            plot_histogram(ax1, actual, 'skyblue')
+            ax1.set_title(f'{metric_name} - Actual\nMean: {actual["mean"]:.4f}, Count: {actual["count"]}')
             ax1.set_xlabel(f'Actual {metric_name}')
             ax1.set_ylabel('Frequency')
             ax1.grid(True, alpha=0.3)
@@ -182,11 +445,10 @@ def create_validation_chart(df, metric_name, actual_col, assumption_col, output_
             ax1.set_title(f'{metric_name} - Actual (No Data)')
         
         # Chart 2: Assumption values
-        if assumption_col and assumption_col in df.columns:
-            assumption_data = df[assumption_col].dropna()
-            if len(assumption_data) > 0:
-                ax2.hist(assumption_data, bins=30, alpha=0.7, color='lightcoral', edgecolor='black')
-                ax2.set_title(f'{metric_name} - Assumption\nMean: {assumption_data.mean():.4f}, Count: {len(assumption_data)}')
+        if assumption is not None:
+            if assumption['count'] > 0:
+                plot_histogram(ax2, assumption, 'lightcoral')
+                ax2.set_title(f'{metric_name} - Assumption\nMean: {assumption["mean"]:.4f}, Count: {assumption["count"]}')
                 ax2.set_xlabel(f'Assumption {metric_name}')
                 ax2.set_ylabel('Frequency')
                 ax2.grid(True, alpha=0.3)
@@ -197,82 +459,134 @@ def create_validation_chart(df, metric_name, actual_col, assumption_col, output_
             ax2.text(0.5, 0.5, 'No assumption column found', ha='center', va='center', transform=ax2.transAxes)
             ax2.set_title(f'{metric_name} - Assumption (Not Available)')
         
-        plt.tight_layout()
-        
         # Save the plot
         filename = f"{metric_name}_validation.png"
         filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(filepath, dpi=100, pil_kwargs={'compress_level': 1})
         
         print(f"  📊 Created validation chart: {filename}")
+        return True
         
     except Exception as e:
         print(f"  ❌ Failed to create validation chart for {metric_name}: {e}")
-        plt.close()
+        return False
 
-def create_dq30_chart(df, output_dir):
-    """Create DQ30 chart (actual only, no assumption)"""
+def create_dq30_chart(actual, output_dir):
+    """Create DQ30 chart (actual only, no assumption) from its column summary"""
     try:
-        plt.figure(figsize=(8, 6))
-        
-        actual_data = df['ACTUAL_DQ30'].dropna()
-        if len(actual_data) > 0:
-            plt.hist(actual_data, bins=30, alpha=0.7, color='skyblue', edgecolor='black')
-            plt.title(f'DQ30 - Actual Only\nMean: {actual_data.mean():.4f}, Count: {len(actual_data)}')
-            plt.xlabel('Actual DQ30')
-            plt.ylabel('Frequency')
-            plt.grid(True, alpha=0.3)
+        fig, ax = _get_dq30_axes()
+        
+        if actual['count'] > 0:
+            plot_histogram(ax, actual, 'skyblue')
+            ax.set_title(f'DQ30 - Actual Only\nMean: {actual["mean"]:.4f}, Count: {actual["count"]}')
+            ax.set_xlabel('Actual DQ30')
+            ax.set_ylabel('Frequency')
+            ax.grid(True, alpha=0.3)
         else:
-            plt.text(0.5, 0.5, 'No DQ30 data available', ha='center', va='center', transform=plt.gca().transAxes)
-            plt.title('DQ30 - Actual (No Data)')
+            ax.text(0.5, 0.5, 'No DQ30 data available', ha='center', va='center', transform=ax.transAxes)
+            ax.set_title('DQ30 - Actual (No Data)')
         
         # Save the plot
         filename = "DQ30_validation.png"
         filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(filepath, dpi=100, pil_kwargs={'compress_level': 1})
         
         print(f"  📊 Created DQ30 chart: {filename}")
+        return True
         
     except Exception as e:
         print(f"  ❌ Failed to create DQ30 chart: {e}")
-        plt.close()
+        return False
+
+def _render_chart(payload):
+    """Render one chart from a (renderer, args) payload (runs in a worker process); True if it was saved"""
+    renderer, args = payload
+    return renderer(*args)
 
-def generate_validation_charts(df, output_dir):
-    """Generate validation charts for all 10 key metrics"""
+def generate_validation_charts(frames, output_dir):
+    """Generate validation charts for all 10 key metrics.
+    frames is an iterable of metric DataFrames, such as one batch per cached record batch."""
     print(f"\n📈 Generating validation charts for 10 key metrics...")
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
-    # Define metric mappings (actual column, assumption column if available)
-    metrics = [
-        ("PBAD_PER_OPEN", "ACTUAL_PBAD_PER_OPEN", "PBAD"),
-        ("SEVERITY", "ACTUAL_SEVERITY", "SEVERITY"),
-        ("UTIL", "ACTUAL_UTIL", "UTILIZATION"),
-        ("CREDIT_LINE", "ACTUAL_CREDIT_LINE", "CREDIT_LINE"),
-        ("CASH_ADVANCE", "ACTUAL_CASH_ADVANCE", "CASH_ADVANCE_AGGREGATE"),
-        ("PENALTY", "ACTUAL_PENALTY", "PENALTY_AGGREGATE"),
-        ("PVOL", "ACTUAL_PVOL", "PVOL_AGGREGATE"),
-        ("ATTRITION", "ACTUAL_ATTRITION", "ATTRITION_AGGREGATE"),
-        ("OUTSTANDING", "ACTUAL_OUTSTANDING", "OUTSTANDING_AGGREGATE")
-    ]
+    # Only the binned counts and summary stats are kept, never the full result
+    summaries = summarize_chart_columns(frames)
     
-    # Generate validation charts for 9 metrics (excluding DQ30)
-    for metric_name, actual_col, assumption_col in metrics:
+    # Build pickle-safe payloads holding only the summaries each chart needs
+    payloads = []
+    
+    # Validation charts for 9 metrics (excluding DQ30)
+    for metric_name, actual_col, assumption_col in VALIDATION_METRICS:
         print(f"\nProcessing {metric_name}...")
-        create_validation_chart(df, metric_name, actual_col, assumption_col, output_dir)
+        if actual_col not in summaries:
+            print(f"  ❌ Failed to create validation chart for {metric_name}: column {actual_col} not found")
+            continue
+        payloads.append((create_validation_chart, (metric_name, summaries[actual_col], summaries.get(assumption_col), output_dir)))
     
-    # Generate DQ30 chart (actual only)
+    # DQ30 chart (actual only)
     print(f"\nProcessing DQ30...")
-    create_dq30_chart(df, output_dir)
+    if 'ACTUAL_DQ30' in summaries:
+        payloads.append((create_dq30_chart, (summaries['ACTUAL_DQ30'], output_dir)))
+    else:
+        print(f"  ❌ Failed to create DQ30 chart: column ACTUAL_DQ30 not found")
+    
+    # Charts are independent, so render them concurrently
+    with ProcessPoolExecutor(max_workers=min(len(payloads), os.cpu_count()) or 1) as executor:
+        charts_created = sum(executor.map(_render_chart, payloads))
     
     print(f"\n📊 Validation chart generation complete!")
-    print(f"  • Total charts created: 10")
+    print(f"  • Total charts created: {charts_created}")
+
+def save_troubleshooting_output(df, base_name, description):
+    """Save a DataFrame as zstd-compressed Parquet; set DEBUG_CSV=1 to also write a CSV copy"""
+    try:
+        parquet_path = f"{base_name}.parquet"
+        df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+        print(f"✅ Saved {description} to {parquet_path}")
+        
+        if os.environ.get('DEBUG_CSV') == '1':
+            csv_path = f"{base_name}.csv"
+            df.to_csv(csv_path, index=False)
+            print(f"✅ Saved {description} to {csv_path}")
+    except Exception as e:
+        print(f"⚠️  Could not save {description}: {e}")
+
+def parse_args():
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Generate actual vs assumption validation charts")
+    parser.add_argument('--debug', action='store_true',
+                        help="save raw SQL output and calculated metrics for troubleshooting (or set DEBUG=1)")
+    parser.add_argument('--cache', action='store_true',
+                        help=f"reuse the query result saved in {CACHE_DIR}/ from an earlier --cache run, or save one")
+    parser.add_argument('--refresh', action='store_true',
+                        help="re-run the query and overwrite the cached result (implies --cache)")
+    return parser.parse_args()
+
+def _format_age(seconds):
+    """Describe a file age in the largest sensible unit"""
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} minutes"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} hours"
+    return f"{seconds / 86400:.1f} days"
+
+def run_query_to_file(sql_query, result_path):
+    """Connect, run the query and save its result to result_path"""
+    connection = connect_to_database()
+    try:
+        save_query_result(connection, sql_query, result_path)
+    finally:
+        print("\n🔐 Closing database connection...")
+        connection.close()
+        print("✅ Database connection closed.")
 
 def main():
     """Main function"""
+    args = parse_args()
+    debug = args.debug or os.environ.get('DEBUG') == '1'
+    
     print("🚀 Starting Validation Chart Generator")
     print("=" * 50)
     
@@ -284,34 +598,43 @@ def main():
     print(f"📖 Reading SQL query from: {sql_file_path}")
     sql_query = read_sql_file(sql_file_path)
     
-    # Step 2: Connect to database
-    connection = connect_to_database()
-    
-    try:
-        # Step 3: Execute query and load data
-        df = execute_query(connection, sql_query)
-        
-        # Save raw SQL output for troubleshooting
-        df.to_csv('raw_sql_output.csv', index=False)
-        print("✅ Saved raw SQL output to raw_sql_output.csv")
-        
-        # Step 4: Calculate metrics
-        df_with_metrics = calculate_metrics(df)
+    # Step 2: Run the query into a local Parquet file; with --cache, reuse an earlier result
+    use_cache = args.cache or args.refresh
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        if use_cache:
+            result_path = query_cache_path(sql_query)
+        else:
+            result_path = os.path.join(scratch_dir, 'query_result.parquet')
         
-        # Save calculated metrics for troubleshooting
-        df_with_metrics.to_csv('calculated_metrics.csv', index=False)
-        print("✅ Saved calculated metrics to calculated_metrics.csv")
+        if use_cache and not args.refresh and os.path.exists(result_path):
+            age = _format_age(time.time() - os.path.getmtime(result_path))
+            print(f"♻️  Using cached query result from {age} ago: {result_path}")
+            print("   Pass --refresh to re-run the query.")
+        else:
+            run_query_to_file(sql_query, result_path)
+        
+        if debug:
+            # Step 3: Load data
+            df = load_query_result(result_path)
+            
+            # Save raw SQL output for troubleshooting
+            save_troubleshooting_output(df, 'raw_sql_output', 'raw SQL output')
+            
+            # Step 4: Calculate metrics
+            df_with_metrics = calculate_metrics(df)
+            
+            # Save calculated metrics for troubleshooting
+            save_troubleshooting_output(df_with_metrics, 'calculated_metrics', 'calculated metrics')
+            
+            frames = [df_with_metrics]
+        else:
+            # Steps 3-4: Calculate metrics batch by batch while binning
+            frames = iter_metric_frames(result_path)
         
         # Step 5: Generate validation charts
-        generate_validation_charts(df_with_metrics, output_directory)
-        
-    finally:
-        # Step 6: Close database connection
-        print("\n🔐 Closing database connection...")
-        connection.close()
-        print("✅ Database connection closed.")
+        generate_validation_charts(frames, output_directory)
     
-    # Step 7: Print completion message
+    # Step 6: Print completion message
     print("\n" + "=" * 50)
     print("🎉 VALIDATION CHARTS CREATED SUCCESSFULLY!")
     print(f"📁 Charts saved to: {os.path.abspath(output_directory)}")